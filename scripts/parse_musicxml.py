@@ -5,16 +5,45 @@ MusicXML to Rochel Music App converter
 Usage:
   python scripts/parse_musicxml.py /path/to/song.mxl
   python scripts/parse_musicxml.py /path/to/song.xml
+  python scripts/parse_musicxml.py --no-cache /path/to/song.xml
 
 Outputs TypeScript arrays for notes, rests, repeats, voltas, time signatures, and lyrics.
+
+Parse results are cached in ~/.cache/rochel, keyed by the SHA-1 of the input
+file and of this script, so re-running over unchanged songs skips the XML work.
+Pass --no-cache to always re-parse.
 """
 
 import xml.etree.ElementTree as ET
 import sys
 import os
+import io
 import zipfile
+import bisect
+import hashlib
+import heapq
+import pickle
 import tempfile
-import math
+from contextlib import redirect_stdout
+from pathlib import Path
+from array import array
+from itertools import repeat
+from operator import itemgetter
+
+
+def iter_closed(source, tags):
+    """
+    Stream the elements named in tags, yielding each one once it is complete.
+    When the caller moves on, the element is cleared so its subtree is freed.
+    """
+    for _, elem in ET.iterparse(source, events=('end',)):
+        if elem.tag in tags:
+            yield elem
+            elem.clear()
+
+
+# Pitch suffix for each <alter> value (semitones)
+ALTER_SUFFIXES = {2: '##', 1: '#', 0: '', -1: 'b', -2: 'bb'}
 
 
 def snap_to_half_beat(beat):
@@ -22,37 +51,82 @@ def snap_to_half_beat(beat):
     Snap beat position to nearest half-beat (0, 0.5, 1, 1.5, etc.)
     The app's editor uses a half-beat grid, so positions like 6.25 or 30.75
     need to be snapped to 6.0 or 31.0 respectively.
+
+    Beats are never negative, so int() truncation is the same as floor().
+    parse_musicxml applies the same expression in bulk to its beat columns.
+    """
+    return int(beat * 2 + 0.5) * 0.5
+
+
+def make_columns(pitches=(), durations=(), beats=(), measures=()):
+    """
+    Columnar storage for notes/rests: parallel pitch, duration, beat and
+    measure arrays instead of one dict per note.
+    """
+    return {
+        'pitch': list(pitches),
+        'duration': array('d', durations),
+        'absoluteBeat': array('d', beats),
+        'measure': array('i', measures),
+    }
+
+
+def find_mxl_score(z):
     """
-    return math.floor(beat * 2 + 0.5) / 2
-
-
-def parse_musicxml(xml_path):
-    tree = ET.parse(xml_path)
-    root = tree.getroot()
-
-    # Get divisions (duration units per quarter note)
-    divisions = 2  # default
-    for attr in root.findall('.//attributes/divisions'):
-        divisions = int(attr.text)
-        break
-
-    # Get initial key signature
-    fifths = 0
-    for key in root.findall('.//key/fifths'):
-        fifths = int(key.text)
-        break
-
-    # Get initial time signature
-    beats = 4
-    beat_type = 4
-    for time in root.findall('.//time'):
-        b = time.find('beats')
-        bt = time.find('beat-type')
-        if b is not None:
-            beats = int(b.text)
-        if bt is not None:
-            beat_type = int(bt.text)
-        break
+    Return the name of the score file inside an .mxl container. The spec'd
+    location is the first <rootfile full-path="..."> in META-INF/container.xml;
+    fall back to score.xml or any top-level .xml file for loose archives.
+    """
+    names = z.namelist()
+
+    if 'META-INF/container.xml' in names:
+        container = ET.fromstring(z.read('META-INF/container.xml'))
+        # Wildcard namespace: container.xml may or may not declare one
+        for rootfile in container.findall('.//{*}rootfile'):
+            full_path = rootfile.get('full-path')
+            if full_path in names:
+                return full_path
+
+    if 'score.xml' in names:
+        return 'score.xml'
+    return next((n for n in names if '/' not in n and n.endswith('.xml')), 'score.xml')
+
+
+def parse_musicxml(source):
+    """
+    Parse a MusicXML score from a file path or a seekable binary file object
+    (e.g. a member opened straight out of an .mxl zip).
+    """
+    # The score is streamed with iterparse rather than loaded as a full tree.
+    # A first pass picks up the initial divisions, key and time signature.
+    # It stops as soon as all four values are known, and in any case at the
+    # end of the first <measure>: <key> and <time> are optional, and a later
+    # change is handled by the measure walk anyway. Without that cut-off a
+    # score lacking either would be parsed end to end into a full tree here.
+    initial = {
+        'divisions': 2,  # duration units per quarter note
+        'fifths': 0,
+        'beats': 4,
+        'beat-type': 4,
+    }
+    pending = set(initial)
+
+    for elem in iter_closed(source, (*initial, 'measure')):
+        if elem.tag == 'measure':
+            break
+        if elem.tag in pending:
+            initial[elem.tag] = int(elem.text)
+            pending.discard(elem.tag)
+            if not pending:
+                break
+
+    if hasattr(source, 'seek'):
+        source.seek(0)
+
+    divisions = initial['divisions']
+    fifths = initial['fifths']
+    beats = initial['beats']
+    beat_type = initial['beat-type']
 
     # Key signature names
     key_names = {
@@ -93,102 +167,40 @@ def parse_musicxml(xml_path):
     print(f"// Divisions: {divisions}")
     print()
 
-    notes = []
-    rests = []
+    # Notes and rests are collected column-wise, appended in lockstep
+    notes = make_columns()
+    note_tie_start = bytearray()
+    note_tie_stop = bytearray()
+    rests = make_columns()
     lyrics_list = []
     current_beat = 0
-    note_id = 1
-    rest_id = 1
     repeats = []
     voltas = []
     time_sig_changes = []
-    measure_beats = {}  # Track beat position at start of each measure
 
     # Track accidentals within a measure (for natural handling)
     measure_accidentals = {}
 
-    for measure in root.findall('.//measure'):
+    # Second pass: walk the measures one at a time, freeing each once processed
+    for measure in iter_closed(source, ('measure',)):
         measure_num = int(measure.get('number'))
-        measure_beats[measure_num] = current_beat
+        measure_start_beat = current_beat
         measure_accidentals = {}  # Reset accidentals at each bar line
 
-        # Check for attribute changes (time sig, key sig, divisions)
-        for attr in measure.findall('attributes'):
-            # Divisions can change mid-piece
-            div_elem = attr.find('divisions')
-            if div_elem is not None:
-                divisions = int(div_elem.text)
-
-            # Key signature change
-            key_elem = attr.find('key')
-            if key_elem is not None:
-                fifths_elem = key_elem.find('fifths')
-                if fifths_elem is not None:
-                    new_fifths = int(fifths_elem.text)
-                    if new_fifths != fifths:
-                        fifths = new_fifths
-                        current_key_sharps, current_key_flats = get_key_accidentals(fifths)
-                        print(f"// Measure {measure_num}: Key change to {key_names.get(fifths, f'{fifths} fifths')}")
-
-            # Time signature change
-            time_elem = attr.find('time')
-            if time_elem is not None:
-                new_beats_elem = time_elem.find('beats')
-                new_beat_type_elem = time_elem.find('beat-type')
-                if new_beats_elem is not None and new_beat_type_elem is not None:
-                    new_b = int(new_beats_elem.text)
-                    new_bt = int(new_beat_type_elem.text)
-                    if new_b != beats or new_bt != beat_type:
-                        beats = new_b
-                        beat_type = new_bt
-                        time_sig_changes.append({
-                            'measureNumber': measure_num,
-                            'timeSignature': {'numerator': beats, 'denominator': beat_type}
-                        })
-                        print(f"// Measure {measure_num}: Time signature change to {beats}/{beat_type}")
-
-        # Check for repeats and voltas in barlines
-        for barline in measure.findall('barline'):
-            location = barline.get('location', 'right')
-
-            repeat = barline.find('repeat')
-            if repeat is not None:
-                direction = repeat.get('direction')
-                repeats.append({
-                    'measure': measure_num,
-                    'direction': direction,
-                    'beat': current_beat,
-                    'location': location
-                })
-                print(f"// Measure {measure_num}: repeat {direction} (beat {current_beat})")
-
-            ending = barline.find('ending')
-            if ending is not None:
-                ending_type = ending.get('type')  # start, stop, discontinue
-                ending_number = ending.get('number', '1')
-                voltas.append({
-                    'measure': measure_num,
-                    'type': ending_type,
-                    'number': ending_number,
-                    'beat': current_beat
-                })
-                print(f"// Measure {measure_num}: volta {ending_number} {ending_type}")
-
+        # One pass over the measure's children, dispatching on tag
         for elem in measure:
-            if elem.tag == 'note':
+            tag = elem.tag
+            if tag == 'note':
                 # Check if it's a rest
+                dur = elem.find('duration')
+
                 if elem.find('rest') is not None:
-                    dur = elem.find('duration')
                     if dur is not None:
                         dur_beats = int(dur.text) / divisions
-                        rests.append({
-                            'id': f'r{rest_id}',
-                            'pitch': 'REST',
-                            'duration': round(dur_beats, 2),
-                            'absoluteBeat': snap_to_half_beat(current_beat),
-                            'measure': measure_num
-                        })
-                        rest_id += 1
+                        rests['pitch'].append('REST')
+                        rests['duration'].append(round(dur_beats, 2))
+                        rests['absoluteBeat'].append(current_beat)
+                        rests['measure'].append(measure_num)
                         current_beat += dur_beats
                     continue
 
@@ -201,66 +213,47 @@ def parse_musicxml(xml_path):
                 is_tie_stop = any(t.get('type') == 'stop' for t in ties)
 
                 pitch = elem.find('pitch')
-                dur = elem.find('duration')
 
                 if pitch is not None and dur is not None:
                     step = pitch.find('step').text
                     octave = int(pitch.find('octave').text)
                     alter_elem = pitch.find('alter')
 
-                    # Handle accidentals
-                    pitch_str = step
-
+                    # Handle accidentals: an explicit <alter>, else one carried
+                    # from earlier in the measure, else the key signature
                     if alter_elem is not None:
                         alt = int(float(alter_elem.text))
-                        if alt == 2:
-                            pitch_str += '##'  # double sharp
-                        elif alt == 1:
-                            pitch_str += '#'
-                        elif alt == -1:
-                            pitch_str += 'b'
-                        elif alt == -2:
-                            pitch_str += 'bb'  # double flat
-                        # alt == 0 means natural (no accidental added)
-
                         # Track this accidental for the measure
                         measure_accidentals[step] = alt
                     else:
-                        # Check if this note was altered earlier in the measure
-                        if step in measure_accidentals:
-                            alt = measure_accidentals[step]
-                            if alt == 1:
-                                pitch_str += '#'
-                            elif alt == -1:
-                                pitch_str += 'b'
-                            elif alt == 2:
-                                pitch_str += '##'
-                            elif alt == -2:
-                                pitch_str += 'bb'
-                            # alt == 0 means natural
-                        else:
-                            # Apply key signature
-                            if step in current_key_sharps:
-                                pitch_str += '#'
-                            elif step in current_key_flats:
-                                pitch_str += 'b'
-
-                    pitch_str += str(octave)
+                        alt = measure_accidentals.get(step)
+
+                    if alt is not None:
+                        # alt == 0 means natural (no accidental added)
+                        pitch_str = step + ALTER_SUFFIXES.get(alt, '')
+                    elif step in current_key_sharps:
+                        pitch_str = step + '#'
+                    elif step in current_key_flats:
+                        pitch_str = step + 'b'
+                    else:
+                        pitch_str = step
+
+                    # Pitches repeat thousands of times in a long score; interning
+                    # keeps one string per pitch and makes equality checks pointer-fast
+                    pitch_str = sys.intern(pitch_str + str(octave))
 
                     dur_beats = int(dur.text) / divisions
 
                     # For chords, don't advance the beat
-                    note_beat = current_beat if not is_chord else notes[-1]['absoluteBeat'] if notes else current_beat
+                    note_beats = notes['absoluteBeat']
+                    note_beat = current_beat if not is_chord else note_beats[-1] if note_beats else current_beat
 
-                    notes.append({
-                        'id': note_id,
-                        'pitch': pitch_str,
-                        'duration': dur_beats,
-                        'absoluteBeat': snap_to_half_beat(note_beat),
-                        'measure': measure_num,
-                        'tie_start': is_tie_start,
-                        'tie_stop': is_tie_stop
-                    })
+                    notes['pitch'].append(pitch_str)
+                    notes['duration'].append(dur_beats)
+                    note_beats.append(note_beat)
+                    notes['measure'].append(measure_num)
+                    note_tie_start.append(is_tie_start)
+                    note_tie_stop.append(is_tie_stop)
 
                     # Extract lyrics
                     for lyric in elem.findall('lyric'):
@@ -269,56 +262,127 @@ def parse_musicxml(xml_path):
                         if text_elem is not None and text_elem.text:
                             lyrics_list.append({
                                 'text': text_elem.text,
-                                'absoluteBeat': snap_to_half_beat(note_beat),
+                                'absoluteBeat': int(note_beat * 2 + 0.5) * 0.5,
                                 'syllabic': syllabic.text if syllabic is not None else None
                             })
 
-                    note_id += 1
-
                     if not is_chord:
                         current_beat += dur_beats
 
-    # Combine tied notes
-    final_notes = []
-    skip_indices = set()
+            elif tag == 'attributes':
+                # Attribute changes (time sig, key sig, divisions)
+                # Divisions can change mid-piece
+                div_elem = elem.find('divisions')
+                if div_elem is not None:
+                    divisions = int(div_elem.text)
+
+                # Key signature change
+                key_elem = elem.find('key')
+                if key_elem is not None:
+                    fifths_elem = key_elem.find('fifths')
+                    if fifths_elem is not None:
+                        new_fifths = int(fifths_elem.text)
+                        if new_fifths != fifths:
+                            fifths = new_fifths
+                            current_key_sharps, current_key_flats = get_key_accidentals(fifths)
+                            print(f"// Measure {measure_num}: Key change to {key_names.get(fifths, f'{fifths} fifths')}")
+
+                # Time signature change
+                time_elem = elem.find('time')
+                if time_elem is not None:
+                    new_beats_elem = time_elem.find('beats')
+                    new_beat_type_elem = time_elem.find('beat-type')
+                    if new_beats_elem is not None and new_beat_type_elem is not None:
+                        new_b = int(new_beats_elem.text)
+                        new_bt = int(new_beat_type_elem.text)
+                        if new_b != beats or new_bt != beat_type:
+                            beats = new_b
+                            beat_type = new_bt
+                            time_sig_changes.append({
+                                'measureNumber': measure_num,
+                                'timeSignature': {'numerator': beats, 'denominator': beat_type}
+                            })
+                            print(f"// Measure {measure_num}: Time signature change to {beats}/{beat_type}")
+
+            elif tag == 'barline':
+                # Repeats and voltas; markers are reported at the measure's start beat
+                location = elem.get('location', 'right')
+
+                repeat_elem = elem.find('repeat')
+                if repeat_elem is not None:
+                    direction = repeat_elem.get('direction')
+                    repeats.append({
+                        'measure': measure_num,
+                        'direction': direction,
+                        'beat': measure_start_beat,
+                        'location': location
+                    })
+                    print(f"// Measure {measure_num}: repeat {direction} (beat {measure_start_beat})")
 
-    for i, note in enumerate(notes):
-        if i in skip_indices:
+                ending = elem.find('ending')
+                if ending is not None:
+                    ending_type = ending.get('type')  # start, stop, discontinue
+                    ending_number = ending.get('number', '1')
+                    voltas.append({
+                        'measure': measure_num,
+                        'type': ending_type,
+                        'number': ending_number,
+                        'beat': measure_start_beat
+                    })
+                    print(f"// Measure {measure_num}: volta {ending_number} {ending_type}")
+
+    # Beats are recorded unsnapped during the walk; snap each column in one pass
+    for columns in (notes, rests):
+        columns['absoluteBeat'] = array(
+            'd', [int(beat * 2 + 0.5) * 0.5 for beat in columns['absoluteBeat']])
+
+    # Combine tied notes in a single forward pass. open_ties maps a pitch to
+    # the final note still waiting for its tie to end; a tie-stop note of
+    # that pitch is folded into it instead of being emitted.
+    final_notes = make_columns()
+    final_durations = final_notes['duration']
+    open_ties = {}
+
+    for i, pitch_str in enumerate(notes['pitch']):
+        duration = notes['duration'][i]
+
+        if note_tie_stop[i] and pitch_str in open_ties:
+            target = open_ties[pitch_str]
+            final_durations[target] += duration
+            # If this note also starts a new tie, the chain continues
+            if not note_tie_start[i]:
+                del open_ties[pitch_str]
             continue
 
-        new_note = {
-            'id': note['id'],
-            'pitch': note['pitch'],
-            'duration': note['duration'],
-            'absoluteBeat': note['absoluteBeat'],
-            'measure': note['measure']
-        }
-
-        # If this note starts a tie, combine durations with following tied notes
-        if note.get('tie_start'):
-            j = i + 1
-            while j < len(notes):
-                if notes[j]['pitch'] == note['pitch'] and notes[j].get('tie_stop'):
-                    new_note['duration'] += notes[j]['duration']
-                    skip_indices.add(j)
-                    # If this note also starts a new tie, continue
-                    if not notes[j].get('tie_start'):
-                        break
-                j += 1
-
-        new_note['duration'] = round(new_note['duration'], 2)
-        final_notes.append(new_note)
-
-    # Merge notes and rests, sorted by absoluteBeat
-    all_items = final_notes + rests
-    all_items.sort(key=lambda x: (x['absoluteBeat'], 0 if x['pitch'] != 'REST' else 1))
+        if note_tie_start[i]:
+            open_ties[pitch_str] = len(final_durations)
+
+        final_notes['pitch'].append(pitch_str)
+        final_durations.append(duration)
+        final_notes['absoluteBeat'].append(notes['absoluteBeat'][i])
+        final_notes['measure'].append(notes['measure'][i])
+
+    for i, duration in enumerate(final_durations):
+        final_durations[i] = round(duration, 2)
+
+    # Merge notes and rests by absoluteBeat (notes before rests on a tie).
+    # Both are generated in beat order, so a linear merge replaces a sort.
+    rows = list(heapq.merge(
+        zip(final_notes['absoluteBeat'], repeat(0), final_notes['pitch'],
+            final_notes['duration'], final_notes['measure']),
+        zip(rests['absoluteBeat'], repeat(1), rests['pitch'],
+            rests['duration'], rests['measure']),
+        key=itemgetter(0, 1),
+    ))
+    all_beats, _, all_pitches, all_durations, all_measures = zip(*rows) if rows else ((),) * 5
+    all_items = make_columns(all_pitches, all_durations, all_beats, all_measures)
 
     print()
-    print(f"// Total notes: {len(final_notes)}")
-    print(f"// Total rests: {len(rests)}")
+    print(f"// Total notes: {len(final_notes['pitch'])}")
+    print(f"// Total rests: {len(rests['pitch'])}")
     print(f"// Total beats: {current_beat}")
-    if all_items:
-        print(f"// Total measures: {max(n['measure'] for n in all_items)}")
+    if all_measures:
+        print(f"// Total measures: {max(all_measures)}")
     print()
 
     return all_items, repeats, voltas, time_sig_changes, lyrics_list, {
@@ -328,20 +392,29 @@ def parse_musicxml(xml_path):
     }
 
 
+def write_lines(lines):
+    """Write a block of output lines with a single stdout write"""
+    sys.stdout.write('\n'.join(lines) + '\n')
+
+
+# One TypeScript note row; id is "<slug>-<n>" for notes and "<slug>-r<n>" for rests
+NOTE_ROW = '    { id: "%s-%s%d", pitch: "%s", duration: %s, absoluteBeat: %s },'
+
+
 def print_notes(items, slug="song", start_id=1):
     """Print notes and rests in TypeScript format"""
-    print("  notes: [")
+    out = ["  notes: ["]
     note_num = start_id
     rest_num = 1
-    for item in items:
-        if item['pitch'] == 'REST':
-            item_id = f"{slug}-r{rest_num}"
+    for pitch, duration, beat in zip(items['pitch'], items['duration'], items['absoluteBeat']):
+        if pitch == 'REST':
+            out.append(NOTE_ROW % (slug, 'r', rest_num, pitch, duration, beat))
             rest_num += 1
         else:
-            item_id = f"{slug}-{note_num}"
+            out.append(NOTE_ROW % (slug, '', note_num, pitch, duration, beat))
             note_num += 1
-        print(f'    {{ id: "{item_id}", pitch: "{item["pitch"]}", duration: {item["duration"]}, absoluteBeat: {item["absoluteBeat"]} }},')
-    print("  ],")
+    out.append("  ],")
+    write_lines(out)
 
 
 def print_repeats(repeats, slug="song"):
@@ -350,25 +423,25 @@ def print_repeats(repeats, slug="song"):
         print("  repeatMarkers: [],")
         return
 
-    print("  repeatMarkers: [")
-    # Group repeats into pairs
-    forwards = [r for r in repeats if r['direction'] == 'forward']
-    backwards = [r for r in repeats if r['direction'] == 'backward']
-
+    out = ["  repeatMarkers: ["]
+    # Group repeats into pairs in one pass: each backward repeat closes the
+    # most recent unmatched forward, so nested repeats pair up correctly.
+    # Left barlines sort before right ones so a one-measure repeat pairs too.
+    open_forwards = []
     pair_id = 1
-    for backward in backwards:
-        # Find matching forward (the one before this backward)
-        matching_forward = None
-        for fwd in forwards:
-            if fwd['measure'] < backward['measure']:
-                matching_forward = fwd
+    for marker in sorted(repeats, key=lambda r: (r['measure'], r['location'] != 'left')):
+        if marker['direction'] == 'forward':
+            open_forwards.append(marker)
+        elif marker['direction'] == 'backward':
+            matching_forward = open_forwards.pop() if open_forwards else None
 
-        if matching_forward:
-            print(f'    {{ id: "{slug}-repeat-start-{pair_id}", pairId: "{slug}-repeat-{pair_id}", type: "start", measureNumber: {matching_forward["measure"] - 1} }},')
-        print(f'    {{ id: "{slug}-repeat-end-{pair_id}", pairId: "{slug}-repeat-{pair_id}", type: "end", measureNumber: {backward["measure"] - 1} }},')
-        pair_id += 1
+            if matching_forward:
+                out.append(f'    {{ id: "{slug}-repeat-start-{pair_id}", pairId: "{slug}-repeat-{pair_id}", type: "start", measureNumber: {matching_forward["measure"] - 1} }},')
+            out.append(f'    {{ id: "{slug}-repeat-end-{pair_id}", pairId: "{slug}-repeat-{pair_id}", type: "end", measureNumber: {marker["measure"] - 1} }},')
+            pair_id += 1
 
-    print("  ],")
+    out.append("  ],")
+    write_lines(out)
 
 
 def print_voltas(voltas, slug="song"):
@@ -377,7 +450,7 @@ def print_voltas(voltas, slug="song"):
         print("  voltaBrackets: [],")
         return
 
-    print("  voltaBrackets: [")
+    out = ["  voltaBrackets: ["]
     # Group voltas by number
     volta_groups = {}
     for v in voltas:
@@ -389,17 +462,18 @@ def print_voltas(voltas, slug="song"):
     volta_id = 1
     for num, group in sorted(volta_groups.items()):
         starts = [v for v in group if v['type'] == 'start']
-        stops = [v for v in group if v['type'] in ('stop', 'discontinue')]
+        stop_measures = sorted(v['measure'] for v in group if v['type'] in ('stop', 'discontinue'))
 
         for start in starts:
-            # Find matching stop
-            stop = next((s for s in stops if s['measure'] >= start['measure']), None)
-            end_measure = stop['measure'] if stop else start['measure']
+            # Find matching stop: the first one at or after the start measure
+            idx = bisect.bisect_left(stop_measures, start['measure'])
+            end_measure = stop_measures[idx] if idx < len(stop_measures) else start['measure']
 
-            print(f'    {{ id: "{slug}-volta-{volta_id}", number: {num}, startMeasure: {start["measure"] - 1}, endMeasure: {end_measure - 1} }},')
+            out.append(f'    {{ id: "{slug}-volta-{volta_id}", number: {num}, startMeasure: {start["measure"] - 1}, endMeasure: {end_measure - 1} }},')
             volta_id += 1
 
-    print("  ],")
+    out.append("  ],")
+    write_lines(out)
 
 
 def print_time_sig_changes(changes):
@@ -408,11 +482,12 @@ def print_time_sig_changes(changes):
         print("  timeSignatureChanges: [],")
         return
 
-    print("  timeSignatureChanges: [")
+    out = ["  timeSignatureChanges: ["]
     for change in changes:
         ts = change['timeSignature']
-        print(f'    {{ measureNumber: {change["measureNumber"] - 1}, timeSignature: {{ numerator: {ts["numerator"]}, denominator: {ts["denominator"]} }} }},')
-    print("  ],")
+        out.append(f'    {{ measureNumber: {change["measureNumber"] - 1}, timeSignature: {{ numerator: {ts["numerator"]}, denominator: {ts["denominator"]} }} }},')
+    out.append("  ],")
+    write_lines(out)
 
 
 def print_lyrics(lyrics, slug="song"):
@@ -421,38 +496,86 @@ def print_lyrics(lyrics, slug="song"):
         print("  lyrics: [],")
         return
 
-    print("  lyrics: [")
+    out = ["  lyrics: ["]
     for lyric in lyrics:
         text = lyric['text'].replace('"', '\\"').replace('\n', '\\n')
-        print(f'    {{ text: "{text}", absoluteBeat: {lyric["absoluteBeat"]} }},')
-    print("  ],")
+        out.append(f'    {{ text: "{text}", absoluteBeat: {lyric["absoluteBeat"]} }},')
+    out.append("  ],")
+    write_lines(out)
+
+
+CACHE_DIR = Path('~/.cache/rochel').expanduser()
+
+
+def parse_file(input_path):
+    """Parse a .mxl or plain MusicXML file"""
+    # Handle .mxl (compressed) files by streaming the score straight out of
+    # the zip rather than extracting the whole container to disk
+    if input_path.endswith('.mxl'):
+        with zipfile.ZipFile(input_path, 'r') as z:
+            with z.open(find_mxl_score(z)) as fh:
+                return parse_musicxml(fh)
+    return parse_musicxml(input_path)
+
+
+def cached_parse_file(input_path):
+    """
+    parse_file() behind a persistent pickle cache. The key covers the input
+    bytes and this script's source, so editing either invalidates the entry.
+    The comments parse_musicxml prints are cached too and replayed on a hit,
+    so the output is identical either way.
+    """
+    digest = hashlib.sha1()
+    for path in (input_path, __file__):
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 16), b''):
+                digest.update(chunk)
+    cache_path = CACHE_DIR / f'{digest.hexdigest()}.pkl'
+
+    try:
+        with open(cache_path, 'rb') as f:
+            log, result = pickle.load(f)
+        if not isinstance(log, str) or len(result) != 6:
+            raise ValueError(f'unexpected cache entry in {cache_path}')
+    except Exception:
+        log = None  # missing, unreadable or malformed entry; parse afresh
+
+    if log is None:
+        buf = io.StringIO()
+        with redirect_stdout(buf):
+            result = parse_file(input_path)
+        log = buf.getvalue()
+
+        # Caching is best-effort; a read-only home shouldn't break the script
+        # and a unique temp file keeps concurrent runs from clobbering each other
+        tmp_path = None
+        try:
+            CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile(dir=CACHE_DIR, suffix='.tmp', delete=False) as f:
+                tmp_path = f.name
+                pickle.dump((log, result), f)
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            if tmp_path is not None and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    sys.stdout.write(log)
+    return result
 
 
 def main():
-    if len(sys.argv) < 2:
-        print("Usage: python parse_musicxml.py <file.mxl or file.xml>")
+    args = [a for a in sys.argv[1:] if a != '--no-cache']
+    if not args:
+        print("Usage: python parse_musicxml.py [--no-cache] <file.mxl or file.xml>")
         sys.exit(1)
 
-    input_path = sys.argv[1]
+    input_path = args[0]
 
-    # Handle .mxl (compressed) files
-    if input_path.endswith('.mxl'):
-        with tempfile.TemporaryDirectory() as tmpdir:
-            with zipfile.ZipFile(input_path, 'r') as z:
-                z.extractall(tmpdir)
-
-            # Find the score.xml file
-            xml_path = os.path.join(tmpdir, 'score.xml')
-            if not os.path.exists(xml_path):
-                # Try to find any .xml file
-                for f in os.listdir(tmpdir):
-                    if f.endswith('.xml') and f != 'container.xml':
-                        xml_path = os.path.join(tmpdir, f)
-                        break
-
-            items, repeats, voltas, time_sigs, lyrics, info = parse_musicxml(xml_path)
+    if '--no-cache' in sys.argv:
+        result = parse_file(input_path)
     else:
-        items, repeats, voltas, time_sigs, lyrics, info = parse_musicxml(input_path)
+        result = cached_parse_file(input_path)
+    items, repeats, voltas, time_sigs, lyrics, info = result
 
     print("// ═══════════════════════════════════════════════════════════════════")
     print("// Full song data:")
@@ -478,17 +601,18 @@ def main():
             print(f"// ═══════════════════════════════════════════════════════════════════")
             print(f"// Repeated section (measures {forward['measure']}-{backward['measure']}):")
             print(f"// ═══════════════════════════════════════════════════════════════════")
-            section_items = [n for n in items if forward['measure'] <= n['measure'] <= backward['measure']]
+            section = [i for i, m in enumerate(items['measure'])
+                       if forward['measure'] <= m <= backward['measure']]
 
             # Adjust absoluteBeat to start from 0
-            if section_items:
-                offset = section_items[0]['absoluteBeat']
-                adjusted = []
-                for n in section_items:
-                    adjusted.append({
-                        **n,
-                        'absoluteBeat': snap_to_half_beat(n['absoluteBeat'] - offset)
-                    })
+            if section:
+                offset = items['absoluteBeat'][section[0]]
+                adjusted = make_columns(
+                    [items['pitch'][i] for i in section],
+                    [items['duration'][i] for i in section],
+                    [snap_to_half_beat(items['absoluteBeat'][i] - offset) for i in section],
+                    [items['measure'][i] for i in section],
+                )
                 print_notes(adjusted)
 
 